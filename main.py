@@ -1,5 +1,10 @@
 import asyncio
+import bisect
+import itertools
+import logging
+import os
 import random
+import pyudev
 import RPi.GPIO as GPIO
 
 from serial_communication import SerialCommunication
@@ -9,100 +14,153 @@ from slot_machine_video import SlotMachineVideo
 
 # Buttons
 BUTTON_PIN = 20  # Pin 20 for the spin button
+BUTTON_BOUNCE_MS = 50
 
 # Serial Communication
 SERIAL_PORT     = "/dev/ttyACM0"
 SERIAL_BAUD     = 115200
 SERIAL_TIMEOUT  = 1        
+SERIAL_RETRY_DELAY     = 0.5
+SERIAL_MAX_RETRY_DELAY = 5.0
 
 # Values
 GAMBLE_AMT = 200
+WIN_CHANCE = 0.2
 GAMBLE_CHANCES  = [10,  50, 100,  200,  500,  1000, 10000,  100000]
 GAMBLE_WEIGHTS  = [0.5, 1,  0.5,  0.4,  0.35, 0.1,  0.01,   0.001 ]
 
+# Losing and every payout laid out on one cumulative scale so a spin needs a
+# single random() draw: [0, 1 - WIN_CHANCE) loses, the rest splits by weight
+_CUM = list(itertools.accumulate(GAMBLE_WEIGHTS))
+_TOTAL = _CUM[-1]
+_FUSED_CUM = [1 - WIN_CHANCE] + [1 - WIN_CHANCE + WIN_CHANCE * c / _TOTAL for c in _CUM]
+_FUSED_VALS = [0] + GAMBLE_CHANCES
+
+# Encoded once since they are sent on every spin
+_GAMBLE_BYTES = f"GAMBLE {GAMBLE_AMT}\n".encode()
+_LOSE_BYTES = b"LOSE\n"
+
+# Per-spin messages go through this logger rather than print so a slow stdout
+# (e.g. an SSH session) can't stall a spin. They are debug level, so run with
+# GAMBLEBOY_LOG_LEVEL=DEBUG to see them.
+log = logging.getLogger('gambleboy')
+log.setLevel(os.environ.get('GAMBLEBOY_LOG_LEVEL', 'WARNING').upper())
+
 # Classes
 
 class Button:
     def __init__(self, pin: int):
+        """Must be created from inside the running event loop"""
         self.pin = pin
-        self.last_state = False
+        self._event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        
+        GPIO.setup(pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        # The callback runs on RPi.GPIO's thread, so hand the edge to the loop
+        GPIO.add_event_detect(pin, GPIO.FALLING,
+                              callback=lambda _: loop.call_soon_threadsafe(self._event.set),
+                              bouncetime=BUTTON_BOUNCE_MS)
         
     def is_pressed(self) -> bool:
         return GPIO.input(self.pin) == GPIO.LOW
         
-    def was_just_pressed(self) -> bool:
-        """Returns True only on the moment the button is pressed (not held)"""
-        current_state = self.is_pressed()
-        if current_state and not self.last_state:
-            self.last_state = current_state
-            return True
-        self.last_state = current_state
-        return False
+    async def wait_press(self):
+        """Wait for the next press, ignoring any that came in while we were busy"""
+        self._event.clear()
+        await self._event.wait()
 
 # Init
 
 GPIO.setmode(GPIO.BCM)
-GPIO.setup(20, GPIO.IN)
 
 video_player = SlotMachineVideo()
 
 serial_comm = SerialCommunication(SERIAL_PORT, SERIAL_BAUD, SERIAL_TIMEOUT)
 
-spin_button = Button(BUTTON_PIN)
-
 
-async def handle_button_presses():
+async def handle_button_presses(spin_button: Button):
     """Handle button press detection and trigger spins"""
     while True:
-        if spin_button.was_just_pressed():
-            print("Spin button pressed! Starting spin...")
-            
-            # Send GAMBLE command before spinning
-            serial_comm.send_data(f"GAMBLE {GAMBLE_AMT}")
-            print(f"Sent: GAMBLE {GAMBLE_AMT}")
-            
-            # Perform the spin
-            payout = await spin()
-            
-            # Send result to RP2350
-            if payout > 0:
-                serial_comm.send_data(f"WIN {payout}")
-                print(f"Sent: WIN {payout} - Won payout: {payout}")
-            else:
-                serial_comm.send_data("LOSE")
-                print("Sent: LOSE - No payout")
-                
-            # Wait a moment before allowing next spin
-            await asyncio.sleep(1)
+        await spin_button.wait_press()
+        log.debug("Spin button pressed! Starting spin...")
+        
+        # Send GAMBLE command before spinning
+        serial_comm.send_bytes(_GAMBLE_BYTES)
+        log.debug("Sent: GAMBLE %d", GAMBLE_AMT)
+        
+        # Perform the spin
+        payout = await spin()
         
-        await asyncio.sleep(0.05)  # Check button every 50ms
+        # Send result to RP2350
+        if payout > 0:
+            serial_comm.send_data(f"WIN {payout}")
+            log.debug("Sent: WIN %d - Won payout: %d", payout, payout)
+        else:
+            serial_comm.send_bytes(_LOSE_BYTES)
+            log.debug("Sent: LOSE - No payout")
+            
+        # Wait a moment before allowing next spin
+        await asyncio.sleep(1)
     
-def get_payout():
-  payout = random.choices(GAMBLE_CHANCES, weights=GAMBLE_WEIGHTS)[0]
-  return payout 
+def roll_payout():
+  # hi bound guards against float rounding at the top of the scale, as random.choices does
+  return _FUSED_VALS[bisect.bisect(_FUSED_CUM, random.random(), 0, len(_FUSED_CUM) - 1)]
   
 async def spin():    
     await video_player.show_spin_animation()
     
-    rand = random.random()
-    if rand < 0.2:
+    payout = roll_payout()
+    if payout > 0:
       await video_player.show_win_animation()
-      return get_payout()
     else:
       await video_player.show_lose_animation()
-      return 0
+    return payout
   
+async def wait_for_serial_port(monitor: pyudev.Monitor):
+    """Sleep until SERIAL_PORT exists, waking only on udev tty events"""
+    loop = asyncio.get_running_loop()
+    readable = asyncio.Event()
+    loop.add_reader(monitor.fileno(), readable.set)
+    try:
+        while not os.path.exists(SERIAL_PORT):
+            await readable.wait()
+            readable.clear()
+            while monitor.poll(timeout=0) is not None:
+                pass  # drain queued events, we only care whether the node is there now
+    finally:
+        loop.remove_reader(monitor.fileno())
+
+async def connect_serial():
+    """Connect to the RP2350 once it's plugged in, backing off on real connect failures"""
+    monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+    monitor.filter_by('tty')
+    monitor.start()  # before the exists() check so a plug-in in between isn't missed
+    
+    delay = SERIAL_RETRY_DELAY
+    while True:
+        await wait_for_serial_port(monitor)
+        if serial_comm.connect():
+            return
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, SERIAL_MAX_RETRY_DELAY)
+
 async def main():
+    logging.basicConfig(format="%(message)s")
+    
+    print("Loading animations...")
+    await video_player.initialize()
+    
     print("Initializing serial communication...")
     
-    while not serial_comm.connect():
-        await asyncio.sleep(0.5)
+    await connect_serial()
         
     print("Connected to RP2350")
-    print("Waiting for button press on pin 20...")
+    print(f"Waiting for button press on pin {BUTTON_PIN}...")
+    
+    spin_button = Button(BUTTON_PIN)
     
     try:
-        await handle_button_presses()
+        await handle_button_presses(spin_button)
         
     except KeyboardInterrupt:
         print("Shutting down...")
@@ -30,39 +30,57 @@ class SerialCommunication:
   def disconnect(self):
     """Close serial connection"""
     if self.connection and self.connection.is_open:
+      self.drain()
       self.connection.close()
       self.connected = False
       print("Serial connection closed")
   
   def send_data(self, data: str) -> bool:
     """Send raw string data to RP2350 with newline"""
+    return self.send_bytes(data.encode('utf-8') + b'\n')
+  
+  def send_bytes(self, data: bytes) -> bool:
+    """Send an already encoded, newline-terminated command to RP2350.
+    
+    Doesn't wait for the UART to drain; call drain() when that matters."""
     if not self.connected or not self.connection:
       print("No serial connection available")
       return False
     
     try:
-      command_with_newline = data + '\n'
-      self.connection.write(command_with_newline.encode('utf-8'))
-      self.connection.flush()
+      self.connection.write(data)
       return True
     except Exception as e:
       print(f"Error sending data: {e}")
       return False
   
+  def drain(self):
+    """Block until everything written so far has left the UART"""
+    try:
+      self.connection.flush()
+    except Exception as e:
+      print(f"Error draining serial: {e}")
+  
   def send_raw_command(self, command: str) -> bool:
     """Send raw command to RP2350 (alias for send_data)"""
     return self.send_data(command)
   
-  def read_data(self) -> dict | None:
-    """Read JSON data from RP2350"""
+  def read_data(self) -> dict | list | None:
+    """Read JSON data from RP2350.
+    
+    Lines that aren't a JSON object/array (plain ACKs like "OK") skip the
+    JSON parser and come back as {'raw': line}."""
     if not self.connected or not self.connection:
       return None
     
     try:
       if self.connection.in_waiting > 0:
         line = self.connection.readline().decode('utf-8').strip()
-        if line:
-          return json.loads(line)
+        if not line:
+          return None
+        if line[0] not in '{[':
+          return {'raw': line}
+        return json.loads(line)
     except Exception as e:
       print(f"Error reading data: {e}")
     return None
\ No newline at end of file
@@ -1,37 +1,108 @@
 import asyncio
+import concurrent.futures
 import os
 import random
 import ST7735
+import spidev
+import numpy as np
+import RPi.GPIO as GPIO
 from PIL import Image
 import glob
 
+DISPLAY_ROTATION = 270
+DISPLAY_DC_PIN = 24
+
+# Frame data goes out over our own spidev handle in SPI_CHUNK_SIZE writes.
+# 4096 is the spidev default bufsiz; raise the kernel limit with
+#   echo 65536 > /sys/module/spidev/parameters/bufsiz
+# and bump SPI_CHUNK_SIZE to match to push a whole frame in fewer syscalls.
+SPI_SPEED_HZ = 24000000
+SPI_CHUNK_SIZE = 4096
+
+def _rgb888_to_rgb565_bytes(img):
+    """Rotate an RGB image for the panel and pack it to big-endian RGB565 bytes.
+    
+    Same result as ST7735.display() produces internally, done with whole-array
+    numpy ops rather than per-pixel Python."""
+    arr = np.rot90(np.asarray(img, dtype=np.uint16), DISPLAY_ROTATION // 90)
+    r, g, b = arr[..., 0], arr[..., 1], arr[..., 2]
+    out = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+    return out.astype('>u2').tobytes()
+
+def _decode_frame(frame_file):
+    """Decode one PNG to a display-ready RGB565 buffer (runs on a pool thread)"""
+    try:
+        return _rgb888_to_rgb565_bytes(Image.open(frame_file).convert('RGB'))
+    except Exception as e:
+        print(f"Error loading {frame_file}: {e}")
+        return None
+
 class SlotMachineVideo:
     def __init__(self):
-        self.disp = ST7735.ST7735(port=0, cs=0, dc=24, rst=25,
-                                  width=128, height=160, rotation=270,
+        self.disp = ST7735.ST7735(port=0, cs=0, dc=DISPLAY_DC_PIN, rst=25,
+                                  width=128, height=160, rotation=DISPLAY_ROTATION,
                                   invert=False, bgr=False)
         self.disp.begin()
         
-        self.win_frames = self.load_frames("winning_frames")
-        self.lose_frames = self.load_frames("awdangit_frames")
-        self.spin_frames = self.load_frames("letsgo_frames")
+        # ST7735 is kept for reset/init and window commands only
+        self.spi = spidev.SpiDev()
+        self.spi.open(0, 0)
+        self.spi.max_speed_hz = SPI_SPEED_HZ
+        self.spi.mode = 0
+        
+        self.win_frames = []
+        self.lose_frames = []
+        self.spin_frames = []
     
-    def load_frames(self, frames_dir):
-        """Load frames from directory"""
+    async def initialize(self):
+        """Load all animations, decoding every frame through one shared pool"""
+        self.win_frames, self.lose_frames, self.spin_frames = await asyncio.to_thread(
+            self._load_all, ("winning_frames", "awdangit_frames", "letsgo_frames"))
+    
+    def _load_all(self, frames_dirs):
+        # Threads rather than processes: PIL and numpy release the GIL for the
+        # heavy lifting, and forking from this already multi-threaded process
+        # (or re-importing main.py under forkserver) would redo hardware setup
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            # Queue every directory before collecting so they all decode at once
+            pending = [self.load_frames(frames_dir, ex) for frames_dir in frames_dirs]
+            return [self._stack_frames(frames) for frames in pending]
+    
+    def load_frames(self, frames_dir, executor):
+        """Queue a directory's frames for decoding, as (file, future) pairs"""
         if not os.path.exists(frames_dir):
             return []
         
         frame_files = sorted(glob.glob(os.path.join(frames_dir, "*.png")))
-        frames = []
+        return [(frame_file, executor.submit(_decode_frame, frame_file)) for frame_file in frame_files]
+    
+    def _stack_frames(self, frames):
+        """Collect decoded frames into RGB565 buffers ready for the display"""
+        decoded = []
+        for frame_file, future in frames:
+            buf = future.result()
+            if buf is None:
+                continue
+            # Stacking needs equal-sized rows; an odd-sized frame would shift every later one
+            if decoded and len(buf) != len(decoded[0]):
+                print(f"Error loading {frame_file}: {len(buf)} bytes, expected {len(decoded[0])}")
+                continue
+            decoded.append(buf)
         
-        for frame_file in frame_files:
-            try:
-                img = Image.open(frame_file).convert('RGB')
-                frames.append(img)
-            except Exception as e:
-                print(f"Error loading {frame_file}: {e}")
+        if not decoded:
+            return []
         
-        return frames
+        # One contiguous (N, H*W*2) array per animation; the returned row views
+        # keep it alive and let playback slice frames without copying
+        anim = np.frombuffer(bytearray(b''.join(decoded)), dtype=np.uint8).reshape(len(decoded), -1)
+        return [memoryview(anim[i]) for i in range(anim.shape[0])]
+    
+    def _blit(self, buf):
+        """Write a precomputed RGB565 frame buffer to the display"""
+        self.disp.set_window()  # full-screen window, leaves the panel in RAMWR
+        GPIO.output(DISPLAY_DC_PIN, GPIO.HIGH)
+        for i in range(0, len(buf), SPI_CHUNK_SIZE):
+            self.spi.writebytes2(buf[i:i + SPI_CHUNK_SIZE])
     
     async def play_animation(self, frames, fps=10):
         """Play animation frames"""
@@ -39,10 +110,16 @@ class SlotMachineVideo:
             return
         
         frame_delay = 1.0 / fps
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
         
-        for frame in frames:
-            self.disp.display(frame)
-            await asyncio.sleep(frame_delay)
+        # Pace against absolute deadlines so SPI time doesn't accumulate as drift;
+        # if a frame overran its slot, go straight to the next one to catch up
+        for i, frame in enumerate(frames):
+            self._blit(frame)
+            remaining = t0 + (i + 1) * frame_delay - loop.time()
+            if remaining > 0:
+                await asyncio.sleep(remaining)
     
     async def show_win_animation(self):
         """Play win animation"""